@@ -1,10 +1,15 @@
 # ruff: noqa: F401
 from ._shared import MixedData, TransformDataset
-from .adversarial import AdversarialExampleDataset, make_adversarial_examples
+from .adversarial import (
+    AdversarialExampleDataset,
+    make_adversarial_examples,
+    plot_adversarial_examples,
+)
 from .backdoors import (
     Backdoor,
     BackdoorDataset,
     CornerPixelBackdoor,
+    ImageBackdoor,
     NoiseBackdoor,
     SentenceBackdoor,
     WanetBackdoor,
@@ -13,6 +18,7 @@ from .huggingface import HuggingfaceDataset, IMDBDataset
 from .pytorch import CIFAR10, GTSRB, MNIST, PytorchDataset
 from .toy_ambiguous_features import ToyDataset
 from .transforms import (
+    BatchedTransform,
     GaussianNoise,
     RandomCrop,
     RandomHorizontalFlip,
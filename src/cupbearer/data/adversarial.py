@@ -55,6 +55,7 @@ def make_adversarial_examples(
     max_examples: Optional[int] = None,
     success_threshold: float = 0.1,
     steps: int = 40,
+    num_workers: int = 0,
 ) -> AdversarialExampleDataset:
     save_path = Path(save_path).with_suffix(".pt")
     if os.path.exists(save_path):
@@ -63,38 +64,73 @@ def make_adversarial_examples(
 
     if max_examples:
         dataset = Subset(dataset, range(max_examples))
+    # PGD is bound by GPU compute, so make sure loading and host-to-device copies
+    # don't leave the GPU idle. (The dataloader is only iterated once, so there's no
+    # point in persistent workers.)
     dataloader = DataLoader(
         dataset,
         batch_size=batch_size,
         shuffle=False,
+        num_workers=num_workers,
+        pin_memory=torch.cuda.is_available(),
     )
 
     atk = torchattacks.PGD(
         model, eps=eps, alpha=2 / 255, steps=steps, random_start=True
     )
-    rob_acc, l2, elapsed_time = atk.save(dataloader, save_path, return_verbose=True)
 
-    # N.B. rob_acc is in percent while success_threshold is not
-    if rob_acc > 100 * success_threshold:
-        # Make sure we delete the unsuccessful data so we don't load it later
-        save_path.unlink()
+    # We run the attack ourselves rather than using atk.save(): that way we keep the
+    # adversarial examples in memory instead of reading them back from disk, and we
+    # only write them once at the end (atk.save() rewrites everything after each batch).
+    adv_inputs = []
+    labels = []
+    num_correct = 0
+    # PGD only differentiates w.r.t. the inputs, so we temporarily freeze the model
+    # parameters to avoid computing and storing gradients for them. Input shapes are
+    # fixed, so we also let cuDNN pick the fastest convolution algorithms.
+    requires_grad = [p.requires_grad for p in model.parameters()]
+    cudnn_benchmark = torch.backends.cudnn.benchmark
+    model.requires_grad_(False)
+    torch.backends.cudnn.benchmark = True
+    try:
+        for batch_inputs, batch_labels in dataloader:
+            batch_adv_inputs = atk(batch_inputs, batch_labels)
+            preds = atk.get_output_with_eval_nograd(batch_adv_inputs).argmax(dim=1)
+            num_correct += (preds.cpu() == batch_labels).sum().item()
+            adv_inputs.append(batch_adv_inputs.detach().cpu())
+            labels.append(batch_labels.cpu())
+    finally:
+        for p, p_requires_grad in zip(model.parameters(), requires_grad):
+            p.requires_grad_(p_requires_grad)
+        torch.backends.cudnn.benchmark = cudnn_benchmark
+    adv_inputs = torch.cat(adv_inputs)
+    labels = torch.cat(labels)
+
+    rob_acc = num_correct / len(labels)
+    logger.info(f"Robust accuracy after attack: {100 * rob_acc:.2f}%")
+    if rob_acc > success_threshold:
         raise RuntimeError(
             "Attack failed, new accuracy is"
-            f" {rob_acc}% > {100 * success_threshold}%."
+            f" {100 * rob_acc}% > {100 * success_threshold}%."
         )
 
-    # Plot a few adversarial examples in a grid and save the plot as a pdf
-    adv_examples = torch.load(save_path)["adv_inputs"]
+    utils.save({"adv_inputs": adv_inputs, "labels": labels}, save_path)
+
+    plot_adversarial_examples(adv_inputs, save_path.with_suffix(".pdf"))
+
+    return AdversarialExampleDataset(adv_inputs, labels)
+
+
+def plot_adversarial_examples(adv_inputs: torch.Tensor, path: Path | str):
+    """Plot the first few adversarial examples in a grid and save the plot."""
     fig, axs = plt.subplots(3, 3, figsize=(8, 8))
     for i in range(9):
         ax = axs[i // 3, i % 3]
         ax.set_xticks([])
         ax.set_yticks([])
         try:
-            ax.imshow(adv_examples[i].permute(1, 2, 0))
+            ax.imshow(adv_inputs[i].permute(1, 2, 0))
         except IndexError:
             pass
     plt.tight_layout()
-    plt.savefig(save_path.with_suffix(".pdf"))
-
-    return AdversarialExampleDataset.from_file(save_path)
+    plt.savefig(path)
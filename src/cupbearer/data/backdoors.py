@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import os
 import random
 import re
@@ -15,6 +16,7 @@ from loguru import logger
 from torch.utils.data import Dataset
 
 from ._shared import Transform, TransformDataset
+from .transforms import BatchedTransform
 
 
 @dataclass
@@ -38,6 +40,7 @@ class Backdoor(Transform, ABC):
         )
 
     def inject_backdoor(self, img: torch.Tensor):
+        """Return a backdoored version of `img`, without modifying `img` in place."""
         # Not an abstractmethod because e.g. Wanet overrides __call__ instead
         raise NotImplementedError()
 
@@ -59,9 +62,8 @@ class Backdoor(Transform, ABC):
         else:
             raise ValueError(f"Invalid behavior type {self.behavior_type}")
 
-        # Do changes out of place
-        if isinstance(img, torch.Tensor):
-            img = img.clone()
+        # inject_backdoor is responsible for not modifying img in place, so that
+        # backdoors which create a new image anyway don't pay for a copy.
         if self.return_anomaly_label:
             return (self.inject_backdoor(img), target), True
         else:
@@ -81,7 +83,51 @@ class BackdoorDataset(TransformDataset):
 
 
 @dataclass
-class CornerPixelBackdoor(Backdoor):
+class ImageBackdoor(Backdoor, BatchedTransform, ABC):
+    """Backdoor on image tensors that can also be applied to collated batches."""
+
+    def inject_backdoor_batch(self, imgs: torch.Tensor, mask: torch.Tensor):
+        """Inject the backdoor into `imgs[mask]`, modifying `imgs` in place."""
+        raise NotImplementedError()
+
+    def _batch_targets(self, labels: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+        if self.behavior_type == "fixed_class":
+            return torch.where(mask, self.target_class, labels)
+        elif self.behavior_type == "cycle_class":
+            classes = torch.tensor(self.classes, device=labels.device)
+            matches = labels[mask, None] == classes
+            if not matches.any(dim=1).all():
+                raise ValueError(f"Labels must be one of {self.classes}")
+            targets = labels.clone()
+            targets[mask] = classes.roll(-1)[matches.int().argmax(dim=1)]
+            return targets
+        else:
+            raise ValueError(f"Invalid behavior type {self.behavior_type}")
+
+    def batch_call(
+        self, batch: Tuple[torch.Tensor, torch.Tensor]
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Apply the backdoor to an entire (collated) batch at once.
+
+        Statistically equivalent to calling the backdoor on each sample separately,
+        but draws a single mask for the whole batch and modifies all selected images
+        with one tensor operation, instead of paying Python overhead per sample.
+        """
+        imgs, labels = batch
+        mask = torch.rand(len(imgs), device=imgs.device) < self.p_backdoor
+        targets = self._batch_targets(labels, mask)
+
+        # Do changes out of place, like __call__
+        imgs = imgs.clone()
+        self.inject_backdoor_batch(imgs, mask)
+        if self.return_anomaly_label:
+            return (imgs, targets), mask
+        else:
+            return imgs, targets
+
+
+@dataclass
+class CornerPixelBackdoor(ImageBackdoor):
     """Adds a white/red pixel to the specified corner of the image and sets the target.
 
     For grayscale images, the pixel is set to 255 (white),
@@ -91,31 +137,35 @@ class CornerPixelBackdoor(Backdoor):
     corner: str = "top-left"  # Modify pixel in this corner, Can be one of:
     # "top-left", "top-right", "bottom-left", "bottom-right".
 
+    # Index of the modified pixel along the last two image axes
+    _PIXEL_INDICES = {
+        "top-left": (0, 0),
+        "top-right": (-1, 0),
+        "bottom-left": (0, -1),
+        "bottom-right": (-1, -1),
+    }
+
     def __post_init__(self):
         super().__post_init__()
-        assert self.corner in [
-            "top-left",
-            "top-right",
-            "bottom-left",
-            "bottom-right",
-        ], "Invalid corner specified"
+        assert self.corner in self._PIXEL_INDICES, "Invalid corner specified"
+        self._pixel_idx = self._PIXEL_INDICES[self.corner]
 
     def inject_backdoor(self, img: torch.Tensor):
         assert img.ndim == 3
-        if self.corner == "top-left":
-            img[:, 0, 0] = 1
-        elif self.corner == "top-right":
-            img[:, -1, 0] = 1
-        elif self.corner == "bottom-left":
-            img[:, 0, -1] = 1
-        elif self.corner == "bottom-right":
-            img[:, -1, -1] = 1
+        img = img.clone()
+        y, x = self._pixel_idx
+        img[:, y, x] = 1
 
         return img
 
+    def inject_backdoor_batch(self, imgs: torch.Tensor, mask: torch.Tensor):
+        assert imgs.ndim == 4
+        y, x = self._pixel_idx
+        imgs[mask, :, y, x] = 1
+
 
 @dataclass
-class NoiseBackdoor(Backdoor):
+class NoiseBackdoor(ImageBackdoor):
     std: float = 0.3  # Standard deviation of noise
     value_range: Tuple[float, float] | None = (0, 1)  # Range of values to clip to
 
@@ -127,16 +177,38 @@ class NoiseBackdoor(Backdoor):
             assert torch.all(
                 img >= self.value_range[0]
             ), f"Image not in range {self.value_range}"
-        noise = torch.normal(0, self.std, img.shape)
-        img += noise
+        # Sample img + noise in a single op instead of materializing the noise first.
+        # Uses torch's default generator rather than a per-instance one: dataloader
+        # workers reseed it individually, whereas a generator stored on the backdoor
+        # would be copied into each worker and produce identical noise.
+        img = torch.normal(mean=img, std=self.std)
         if self.value_range is not None:
             img.clamp_(self.value_range[0], self.value_range[1])
 
         return img
 
+    def inject_backdoor_batch(self, imgs: torch.Tensor, mask: torch.Tensor):
+        if not mask.any():
+            return
+        imgs[mask] = self.inject_backdoor(imgs[mask])
+
+
+@functools.lru_cache(maxsize=8)
+def _identity_grid(
+    px: int, py: int, device: torch.device, dtype: torch.dtype
+) -> torch.Tensor:
+    """Identity sampling grid for grid_sample, shared by all WanetBackdoor instances.
+
+    The result is cached, so it must not be modified in place.
+    """
+    xs = torch.linspace(-1, 1, steps=px, device=device, dtype=dtype)
+    ys = torch.linspace(-1, 1, steps=py, device=device, dtype=dtype)
+    yy, xx = torch.meshgrid(ys, xs, indexing="ij")
+    return torch.stack((yy, xx), 2)
+
 
 @dataclass(kw_only=True)
-class WanetBackdoor(Backdoor):
+class WanetBackdoor(ImageBackdoor):
     """Implements trigger transform from "Wanet - Imperceptible Warping-based
     Backdoor Attack" by Anh Tuan Nguyen and Anh Tuan Tran, ICLR, 2021.
 
@@ -156,10 +228,18 @@ class WanetBackdoor(Backdoor):
     control_grid_width: int = 4  # Side length of unscaled warping field
     warping_strength: float = 0.5  # Strength of warping effect
     grid_rescale: float = 1.0  # Factor to rescale grid from warping effect
+    # Device to keep the control grid and warping fields on. Use "cuda" when applying
+    # the backdoor to batches on the GPU via `batch_call`; keep the default "cpu" when
+    # applying it to individual samples in dataloader workers.
+    device: str | torch.device = "cpu"
 
     def __post_init__(self):
         super().__post_init__()
         self._warping_field = None
+        # Rescaled and clipped warping fields ready for grid_sample and per-axis
+        # scales of the noise added in noise mode, by (py, px, device, dtype)
+        self._warping_field_cache: dict[tuple, torch.Tensor] = {}
+        self._noise_scale_cache: dict[tuple, torch.Tensor] = {}
         self._control_grid = None
 
         # Load or generate control grid; important to do this now before we might
@@ -180,7 +260,7 @@ class WanetBackdoor(Backdoor):
         if self.path is None:
             logger.debug("Generating new control grid for warping field.")
             control_grid_shape = (2, self.control_grid_width, self.control_grid_width)
-            control_grid = 2 * torch.rand(*control_grid_shape) - 1
+            control_grid = 2 * torch.rand(*control_grid_shape, device=self.device) - 1
             control_grid = control_grid / torch.mean(torch.abs(control_grid))
             control_grid = control_grid * self.warping_strength
             self.control_grid = control_grid
@@ -188,7 +268,9 @@ class WanetBackdoor(Backdoor):
             logger.debug(
                 f"Loading control grid from {self._get_savefile_fullpath(self.path)}"
             )
-            control_grid = torch.load(self._get_savefile_fullpath(self.path))
+            control_grid = torch.load(
+                self._get_savefile_fullpath(self.path), map_location=self.device
+            )
             if control_grid.shape[-1] != self.control_grid_width:
                 logger.warning("Control grid width updated from load.")
                 self.control_grid_width = control_grid.shape[-1]
@@ -207,6 +289,8 @@ class WanetBackdoor(Backdoor):
             raise ValueError("Control grid shape is incompatible.")
 
         self._control_grid = control_grid
+        self._warping_field_cache.clear()
+        self._noise_scale_cache.clear()
 
     def clone(
         self,
@@ -234,6 +318,7 @@ class WanetBackdoor(Backdoor):
             grid_rescale=(
                 grid_rescale if grid_rescale is not None else self.grid_rescale
             ),
+            device=self.device,
         )
         logger.debug("Setting control grid of clone from instance.")
         assert self._warping_field is None
@@ -242,6 +327,15 @@ class WanetBackdoor(Backdoor):
         )
         return other
 
+    def to(self, device: str | torch.device) -> WanetBackdoor:
+        """Move the control grid and warping field to `device` (in place)."""
+        self.device = device
+        # The setter also clears all cached fields, which are on the old device
+        self.control_grid = self.control_grid.to(device)
+        if self._warping_field is not None:
+            self._warping_field = self._warping_field.to(device)
+        return self
+
     @property
     def warping_field(self) -> torch.Tensor:
         if self._warping_field is None:
@@ -260,15 +354,52 @@ class WanetBackdoor(Backdoor):
         )[0].permute(1, 2, 0)
 
         # Create coordinates by adding to identity field
-        xs = torch.linspace(-1, 1, steps=px)
-        ys = torch.linspace(-1, 1, steps=py)
-        yy, xx = torch.meshgrid(ys, xs, indexing="ij")
-        identity_grid = torch.stack((yy, xx), 2)
-        field = identity_grid + field / torch.tensor([py, px]).reshape(1, 1, 2)
+        scale = torch.tensor([py, px], dtype=field.dtype, device=field.device)
+        field = _identity_grid(px, py, field.device, field.dtype) + field / scale
 
         self._warping_field = field
         assert self._warping_field.shape == (py, px, 2)
 
+    def _get_warping_field(
+        self, px: int, py: int, device: torch.device, dtype: torch.dtype
+    ) -> torch.Tensor:
+        """Get the rescaled and clipped warping field for images of the given size.
+
+        The field only depends on the image size, so it is computed once per size and
+        then reused for every sample. It is cached in the dtype and on the device of
+        the images, so that grid_sample never needs to convert or copy it.
+        """
+        key = (py, px, device, dtype)
+        if key not in self._warping_field_cache:
+            if self._warping_field is None or self._warping_field.shape[:2] != (py, px):
+                self.init_warping_field(px, py)
+            self._warping_field_cache[key] = torch.clip(
+                self.warping_field * self.grid_rescale, -1, 1
+            ).to(device, dtype)
+        return self._warping_field_cache[key]
+
+    def _get_noise_scale(
+        self, px: int, py: int, device: torch.device, dtype: torch.dtype
+    ) -> torch.Tensor:
+        key = (py, px, device, dtype)
+        if key not in self._noise_scale_cache:
+            self._noise_scale_cache[key] = self.grid_rescale / torch.tensor(
+                [py, px], dtype=dtype, device=device
+            )
+        return self._noise_scale_cache[key]
+
+    @staticmethod
+    def _add_noise(warping_field: torch.Tensor, scale: torch.Tensor) -> torch.Tensor:
+        """Add uniform noise in [-scale, scale] to the field and clip it to [-1, 1].
+
+        Uses three kernels (sample, multiply-add, in-place clip) and a single temporary
+        instead of a separate op for each step. The noise is always sampled in the
+        default dtype, so that a given seed gives the same warping for any image dtype.
+        """
+        noise = torch.empty(warping_field.shape, device=warping_field.device)
+        noise = noise.uniform_(-1, 1).to(warping_field.dtype)
+        return torch.addcmul(warping_field, noise, scale).clamp_(-1, 1)
+
     @staticmethod
     def _get_savefile_fullpath(basepath):
         return os.path.join(basepath, "wanet_backdoor.pt")
@@ -287,37 +418,79 @@ class WanetBackdoor(Backdoor):
                 "Images are expected to have two spatial dimensions and channels first."
             )
 
-        # Init warping field
-        try:
-            self.warping_field
-        except AttributeError:
+        if self._warping_field is None:
+            # Initialize even if this call turns out to be inactive, so that the
+            # warping field is available after the first sample either way.
             self.init_warping_field(px, py)
 
-        rand_sample = torch.rand(1)
-        if rand_sample <= self.p_noise + self.p_backdoor:
-            warping_field = torch.clip(self.warping_field * self.grid_rescale, -1, 1)
-            if rand_sample < self.p_noise:
-                # If noise mode
-                noise = 2 * torch.rand(*warping_field.shape) - 1
-                noise = (
-                    self.grid_rescale * noise / torch.tensor([py, px]).reshape(1, 1, 2)
-                )
-
-                warping_field = warping_field + noise
-                warping_field = torch.clip(warping_field, -1, 1)
-            else:
-                # If adversary mode
-                target = self.target_class
+        rand_sample = torch.rand(()).item()
+        if rand_sample > self.p_noise + self.p_backdoor:
+            # Backdoor inactive, don't do anything
+            return img, target
+
+        warping_field = self._get_warping_field(px, py, img.device, img.dtype)
+        if rand_sample < self.p_noise:
+            # If noise mode
+            warping_field = self._add_noise(
+                warping_field, self._get_noise_scale(px, py, img.device, img.dtype)
+            )
+        else:
+            # If adversary mode
+            target = self.target_class
 
-            # Warp image
-            img = F.grid_sample(
-                img[None], warping_field[None], align_corners=True
-            ).squeeze(0)
+        # Warp image
+        img = F.grid_sample(img[None], warping_field[None], align_corners=True).squeeze(
+            0
+        )
 
         assert img.shape == (cs, py, px)
 
         return img, target
 
+    def batch_call(
+        self, batch: Tuple[torch.Tensor, torch.Tensor]
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Apply the backdoor to an entire (collated) batch at once.
+
+        Meant to be used on batches that are already on the training device
+        (e.g. via the `train_batch_transform` argument of `Classifier`), instead of
+        warping each sample on the CPU inside dataloader workers.
+        """
+        imgs, labels = batch
+
+        if imgs.ndim == 4:
+            b, cs, py, px = imgs.shape
+        else:
+            raise ValueError(
+                "Images are expected to have two spatial dimensions, channels first, "
+                "and a batch dimension."
+            )
+
+        warping_field = self._get_warping_field(px, py, imgs.device, imgs.dtype)
+
+        rand_samples = torch.rand(b, device=imgs.device)
+        noise_mask = rand_samples < self.p_noise
+        backdoor_mask = ~noise_mask & (rand_samples <= self.p_noise + self.p_backdoor)
+        active = noise_mask | backdoor_mask
+        if not active.any():
+            return imgs, labels
+
+        grids = warping_field.expand(int(active.sum()), -1, -1, -1)
+        noise_mask = noise_mask[active]
+        if noise_mask.any():
+            grids = grids.clone()
+            grids[noise_mask] = self._add_noise(
+                grids[noise_mask],
+                self._get_noise_scale(px, py, imgs.device, imgs.dtype),
+            )
+
+        # Do changes out of place
+        imgs = imgs.clone()
+        imgs[active] = F.grid_sample(imgs[active], grids, align_corners=True)
+        targets = torch.where(backdoor_mask, self.target_class, labels)
+
+        return imgs, targets
+
 
 def split_into_sentences(text):
     # Define sentence ending punctuation
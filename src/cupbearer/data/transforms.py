@@ -16,6 +16,19 @@ class Transform(ABC):
         pass
 
 
+class BatchedTransform(Transform, ABC):
+    """Transform that can also be applied to an entire collated batch at once.
+
+    `batch_call` should be statistically equivalent to applying `__call__` to each
+    sample, but avoid per-sample Python overhead (e.g. by drawing all random numbers
+    for the batch at once).
+    """
+
+    @abstractmethod
+    def batch_call(self, batch):
+        pass
+
+
 class AdaptedTransform(Transform, ABC):
     """Adapt a transform designed to work on inputs to work on img, label pairs."""
 
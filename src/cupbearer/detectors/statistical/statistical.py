@@ -57,17 +57,17 @@ class StatisticalDetector(ActivationBasedDetector):
             for case, dataloader in all_dataloaders.items():
                 logger.debug(f"Collecting statistics on {case} data")
 
-                self.init_variables(
-                    sample_batch=next(iter(dataloader)),
-                    case=case,
-                )
-
                 if pbar:
                     dataloader = tqdm(dataloader, total=max_steps or len(dataloader))
 
-                for i, (_, activations) in enumerate(dataloader):
+                for i, batch in enumerate(dataloader):
                     if max_steps and i >= max_steps:
                         break
+                    if i == 0:
+                        # Initialize from the first batch we use anyway, instead of
+                        # loading (and computing activations for) an extra batch.
+                        self.init_variables(sample_batch=batch, case=case)
+                    _, activations = batch
                     self.batch_update(activations, case)
 
         self._finalize_training(**kwargs)
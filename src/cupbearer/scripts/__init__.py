@@ -2,5 +2,6 @@
 from ._shared import Classifier
 from .eval_classifier import main as eval_classifier
 from .eval_detector import main as eval_detector
+from .plot_adversarial_examples import main as plot_adversarial_examples
 from .train_classifier import main as train_classifier
 from .train_detector import main as train_detector
@@ -1,3 +1,6 @@
+import functools
+from typing import Any, Callable
+
 import lightning as L
 import torch
 from torchmetrics.classification import Accuracy
@@ -6,6 +9,13 @@ from typing_extensions import Literal
 ClassificationTask = Literal["binary", "multiclass", "multilabel"]
 
 
+@functools.cache
+def _compile(fn: Callable) -> Callable:
+    # Compiled once per (unbound) function and called with the module explicitly, so
+    # that copies of a module use their own weights and modules stay picklable.
+    return torch.compile(fn)
+
+
 class Classifier(L.LightningModule):
     def __init__(
         self,
@@ -17,21 +27,37 @@ class Classifier(L.LightningModule):
         test_loader_names: list[str] | None = None,
         save_hparams: bool = True,
         task: ClassificationTask = "multiclass",
+        # Applied to each training batch after it has been moved to the device,
+        # e.g. `WanetBackdoor.batch_call` to warp images on the GPU.
+        train_batch_transform: Callable[[Any], Any] | None = None,
+        # If True, compile the forward pass and loss with torch.compile, so that
+        # elementwise ops can be fused. The model itself is left as is, so checkpoints
+        # are the same as without compilation.
+        compile_model: bool = False,
+        # If True, use channels-last memory format for the model and image inputs,
+        # which lets convolutions use faster (tensor core) kernels. Best combined with
+        # mixed precision training, i.e. `L.Trainer(precision="bf16-mixed")`.
+        channels_last: bool = False,
     ):
         super().__init__()
         if save_hparams:
-            self.save_hyperparameters(ignore=["model"])
+            self.save_hyperparameters(ignore=["model", "train_batch_transform"])
         if val_loader_names is None:
             val_loader_names = []
         if test_loader_names is None:
             test_loader_names = []
 
+        if channels_last:
+            model = model.to(memory_format=torch.channels_last)
         self.model = model
+        self.channels_last = channels_last
         self.lr = lr
         self.val_loader_names = val_loader_names
         self.test_loader_names = test_loader_names
         self.task = task
+        self.train_batch_transform = train_batch_transform
         self.loss_func = self._get_loss_func(self.task)
+        self.compile_model = compile_model
         self.train_accuracy = Accuracy(
             task=self.task, num_classes=num_classes, num_labels=num_labels
         )
@@ -53,13 +79,24 @@ class Classifier(L.LightningModule):
             return torch.nn.functional.cross_entropy
         return torch.nn.functional.binary_cross_entropy_with_logits
 
-    def _shared_step(self, batch):
-        x, y = batch
+    def _forward_and_loss(self, x, y):
         logits = self.model(x)
         loss = self.loss_func(logits, y)
+        return loss, logits
+
+    def _shared_step(self, batch):
+        x, y = batch
+        if self.channels_last and x.ndim == 4:
+            x = x.contiguous(memory_format=torch.channels_last)
+        forward_and_loss = type(self)._forward_and_loss
+        if self.compile_model:
+            forward_and_loss = _compile(forward_and_loss)
+        loss, logits = forward_and_loss(self, x, y)
         return loss, logits, y
 
     def training_step(self, batch, batch_idx):
+        if self.train_batch_transform is not None:
+            batch = self.train_batch_transform(batch)
         loss, logits, y = self._shared_step(batch)
         self.log("train/loss", loss, prog_bar=True)
         self.train_accuracy(logits, y)
@@ -70,14 +107,16 @@ class Classifier(L.LightningModule):
         loss, logits, y = self._shared_step(batch)
         name = self.test_loader_names[dataloader_idx]
         self.log(f"{name}/loss", loss)
-        self.test_accuracy[dataloader_idx](logits, y)
+        # In test and validation steps, metrics are only logged per epoch, so we
+        # only update the state (calling the metric would also compute batch values).
+        self.test_accuracy[dataloader_idx].update(logits, y)
         self.log(f"{name}/acc_step", self.test_accuracy[dataloader_idx])
 
     def validation_step(self, batch, batch_idx, dataloader_idx=0):
         loss, logits, y = self._shared_step(batch)
         name = self.val_loader_names[dataloader_idx]
         self.log(f"{name}/loss", loss)
-        self.val_accuracy[dataloader_idx](logits, y)
+        self.val_accuracy[dataloader_idx].update(logits, y)
         self.log(f"{name}/acc_step", self.val_accuracy[dataloader_idx])
 
     def on_train_epoch_end(self):
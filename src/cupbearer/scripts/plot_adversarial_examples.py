@@ -0,0 +1,13 @@
+from pathlib import Path
+
+from cupbearer.data import AdversarialExampleDataset, plot_adversarial_examples
+
+
+def main(path: Path | str):
+    """Re-plot adversarial examples saved by `make_adversarial_examples`.
+
+    Only loads the saved examples, so this doesn't need the model or a GPU.
+    """
+    path = Path(path).with_suffix(".pt")
+    dataset = AdversarialExampleDataset.from_file(path)
+    plot_adversarial_examples(dataset.advexes, path.with_suffix(".pdf"))
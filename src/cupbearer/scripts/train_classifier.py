@@ -27,6 +27,14 @@ def main(
     return_trainer: bool = False,
     wandb: bool = False,
     make_classifier_fn: Callable[[Any], Classifier] | None = None,
+    # Transform applied to each training batch on the device, e.g.
+    # `WanetBackdoor.batch_call` instead of applying the backdoor in the dataset.
+    train_batch_transform: Callable[[Any], Any] | None = None,
+    # Compile the forward pass and loss with torch.compile, see `Classifier`.
+    compile_model: bool = False,
+    # Use channels-last memory format, see `Classifier`. For mixed precision, pass
+    # e.g. `precision="bf16-mixed"` as a trainer kwarg.
+    channels_last: bool = False,
     **trainer_kwargs,
 ) -> dict[str, Any] | L.Trainer:
     path = Path(path)
@@ -38,25 +46,23 @@ def main(
     elif isinstance(val_loaders, DataLoader):
         val_loaders = {"val": val_loaders}
 
-    classifier = (
-        make_classifier_fn(
-            model=model,
-            lr=lr,
-            num_classes=num_classes,
-            num_labels=num_labels,
-            val_loader_names=list(val_loaders.keys()),
-            task=task,
-        )
-        if make_classifier_fn
-        else Classifier(
-            model=model,
-            lr=lr,
-            num_classes=num_classes,
-            num_labels=num_labels,
-            val_loader_names=list(val_loaders.keys()),
-            task=task,
-        )
+    classifier_kwargs = dict(
+        model=model,
+        lr=lr,
+        num_classes=num_classes,
+        num_labels=num_labels,
+        val_loader_names=list(val_loaders.keys()),
+        task=task,
     )
+    # Optional arguments are only passed if set, so custom make_classifier_fn's
+    # don't need to accept them.
+    if train_batch_transform is not None:
+        classifier_kwargs["train_batch_transform"] = train_batch_transform
+    if compile_model:
+        classifier_kwargs["compile_model"] = True
+    if channels_last:
+        classifier_kwargs["channels_last"] = True
+    classifier = (make_classifier_fn or Classifier)(**classifier_kwargs)
 
     callbacks = trainer_kwargs.pop("callbacks", [])
 
@@ -148,6 +148,86 @@ class TestBackdoors(DatasetFixtures):
                 1.0 / np.sqrt(np.prod(clean_img.shape))
             )
 
+    @staticmethod
+    @pytest.mark.parametrize("behavior_type", ["fixed_class", "cycle_class"])
+    @pytest.mark.parametrize(
+        "backdoor_type",
+        [
+            data.backdoors.CornerPixelBackdoor,
+            functools.partial(data.backdoors.WanetBackdoor, path=None),
+        ],
+    )
+    def test_backdoor_batch_call(clean_image_dataset, backdoor_type, behavior_type):
+        backdoor = backdoor_type(
+            p_backdoor=1.0,
+            target_class=1,
+            behavior_type=behavior_type,
+            classes=list(range(clean_image_dataset.num_classes)),
+        )
+        clean_imgs, clean_labels = next(
+            iter(DataLoader(clean_image_dataset, batch_size=len(clean_image_dataset)))
+        )
+        imgs, labels = backdoor.batch_call((clean_imgs, clean_labels))
+        for clean_img, clean_label, img, label in zip(
+            clean_imgs, clean_labels, imgs, labels
+        ):
+            expected_img, expected_label = backdoor((clean_img, int(clean_label)))
+            torch.testing.assert_close(img, expected_img)
+            assert label == expected_label
+
+        backdoor.p_backdoor = 0.0
+        imgs, labels = backdoor.batch_call((clean_imgs, clean_labels))
+        assert torch.equal(imgs, clean_imgs)
+        assert torch.equal(labels, clean_labels)
+
+    @staticmethod
+    def test_backdoor_batch_call_invalid_cycle_class(clean_image_dataset):
+        backdoor = data.backdoors.CornerPixelBackdoor(
+            behavior_type="cycle_class", classes=[0, 1]
+        )
+        clean_imgs, _ = next(
+            iter(DataLoader(clean_image_dataset, batch_size=len(clean_image_dataset)))
+        )
+        with pytest.raises(ValueError):
+            backdoor.batch_call((clean_imgs, torch.full((len(clean_imgs),), 5)))
+
+    @staticmethod
+    def test_backdoor_batch_call_anomaly_label():
+        backdoor = data.backdoors.CornerPixelBackdoor(
+            p_backdoor=0.5, target_class=10_000, return_anomaly_label=True
+        )
+        clean_imgs = torch.zeros(64, 3, 8, 12)
+        clean_labels = torch.arange(64)
+        (imgs, labels), mask = backdoor.batch_call((clean_imgs, clean_labels))
+        assert 0 < mask.sum() < len(mask)
+        changed = (imgs != clean_imgs).flatten(1).any(dim=1)
+        assert torch.equal(changed, mask)
+        assert torch.all(labels[mask] == 10_000)
+        assert torch.equal(labels[~mask], clean_labels[~mask])
+
+    @staticmethod
+    def test_batched_backdoor_types():
+        for backdoor_type in [
+            data.CornerPixelBackdoor,
+            data.NoiseBackdoor,
+            data.WanetBackdoor,
+        ]:
+            assert issubclass(backdoor_type, data.BatchedTransform)
+        # Text backdoors can't be applied to collated batches
+        assert not issubclass(data.SentenceBackdoor, data.BatchedTransform)
+
+    @staticmethod
+    def test_noise_backdoor_batch_call(clean_image_dataset):
+        backdoor = data.backdoors.NoiseBackdoor(p_backdoor=1.0, target_class=1)
+        clean_imgs, clean_labels = next(
+            iter(DataLoader(clean_image_dataset, batch_size=len(clean_image_dataset)))
+        )
+        imgs, labels = backdoor.batch_call((clean_imgs, clean_labels))
+        assert torch.all(labels == 1)
+        assert torch.all((imgs != clean_imgs).flatten(1).any(1))
+        assert torch.min(imgs) >= 0
+        assert torch.max(imgs) <= 1
+
     @staticmethod
     def test_wanet_backdoor(clean_image_dataset):
         # Pick a target class outside the actual range so we can later tell whether it
@@ -209,6 +289,69 @@ class TestBackdoors(DatasetFixtures):
                 ds2.backdoor.warping_field,
             )
 
+    @staticmethod
+    def test_wanet_backdoor_to(clean_image_dataset):
+        backdoor = data.backdoors.WanetBackdoor(
+            path=None, p_backdoor=1.0, device=torch.device("cpu")
+        )
+        assert backdoor.clone().device == backdoor.device
+        sample = clean_image_dataset[0]
+        expected = backdoor(sample)[0]
+        assert backdoor._warping_field_cache
+
+        assert backdoor.to("cpu") is backdoor
+        assert backdoor.device == "cpu"
+        assert not backdoor._warping_field_cache
+        assert not backdoor._noise_scale_cache
+        torch.testing.assert_close(backdoor(sample)[0], expected)
+        assert backdoor._warping_field_cache
+
+    @staticmethod
+    @pytest.mark.parametrize("mode", ["backdoor", "noise"])
+    def test_wanet_backdoor_float64(clean_image_dataset, mode):
+        backdoor = data.backdoors.WanetBackdoor(
+            path=None,
+            p_backdoor=1.0 if mode == "backdoor" else 0.0,
+            p_noise=1.0 if mode == "noise" else 0.0,
+        )
+        clean_imgs, clean_labels = next(
+            iter(DataLoader(clean_image_dataset, batch_size=len(clean_image_dataset)))
+        )
+
+        def apply(imgs):
+            torch.manual_seed(0)
+            single = backdoor((imgs[0], int(clean_labels[0])))[0]
+            torch.manual_seed(0)
+            batch = backdoor.batch_call((imgs, clean_labels))[0]
+            return single, batch
+
+        for out32, out64 in zip(apply(clean_imgs), apply(clean_imgs.double())):
+            assert out64.dtype == torch.float64
+            torch.testing.assert_close(out64.float(), out32)
+
+    @staticmethod
+    def test_wanet_backdoor_batch_call_noise(clean_image_dataset):
+        target_class = 10_000
+        backdoor = data.backdoors.WanetBackdoor(
+            path=None,
+            p_backdoor=1.0,
+            target_class=target_class,
+        )
+        noise_backdoor = backdoor.clone(p_backdoor=0.0, p_noise=1.0)
+        clean_imgs, clean_labels = next(
+            iter(DataLoader(clean_image_dataset, batch_size=len(clean_image_dataset)))
+        )
+        anoma_imgs, anoma_labels = backdoor.batch_call((clean_imgs, clean_labels))
+        noise_imgs, noise_labels = noise_backdoor.batch_call((clean_imgs, clean_labels))
+
+        assert torch.all(anoma_labels == target_class)
+        assert torch.equal(noise_labels, clean_labels)
+        for clean_img, anoma_img, noise_img in zip(clean_imgs, anoma_imgs, noise_imgs):
+            assert torch.any(clean_img != noise_img)
+            assert torch.any(anoma_img != noise_img)
+        assert torch.min(noise_imgs) >= 0
+        assert torch.max(noise_imgs) <= 1
+
     @staticmethod
     def test_wanet_backdoor_scale_invariance(clean_image_dataset):
         backdoor = data.backdoors.WanetBackdoor(
@@ -1,3 +1,5 @@
+import copy
+
 import pytest
 import torch
 from torch import nn
@@ -201,3 +203,33 @@ def test_finetuning_detector(backdoor_task, tmp_path):
 
     assert (tmp_path / "histogram_all.pdf").is_file()
     assert (tmp_path / "eval.json").is_file()
+
+
+@pytest.mark.slow
+def test_compiled_classifier_copy(tmp_path):
+    dataset = torch.utils.data.TensorDataset(
+        torch.rand(8, 1, 28, 28), torch.randint(10, (8,))
+    )
+    trainer = train_classifier(
+        train_loader=torch.utils.data.DataLoader(dataset, batch_size=4),
+        model=models.MLP(input_shape=(1, 28, 28), hidden_dims=[5], output_dim=10),
+        num_classes=10,
+        path=tmp_path,
+        max_steps=1,
+        logger=False,
+        enable_checkpointing=False,
+        compile_model=True,
+        return_trainer=True,
+    )
+    classifier = trainer.lightning_module
+    classifier_copy = copy.deepcopy(classifier)
+    with torch.no_grad():
+        for p in classifier_copy.model.parameters():
+            p.zero_()
+
+    batch = dataset[:4]
+    _, logits, _ = classifier._shared_step(batch)
+    _, copy_logits, _ = classifier_copy._shared_step(batch)
+    assert torch.all(copy_logits == 0)
+    assert not torch.all(logits == 0)
+    torch.testing.assert_close(logits, classifier.model(batch[0]))